@@ -2,6 +2,7 @@ from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 import os
 import tempfile
+import shutil
 from werkzeug.utils import secure_filename
 import traceback
 import fitz  # PyMuPDF
@@ -10,34 +11,126 @@ from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
+from lxml import etree
 import pythoncom
 import win32com.client
 import subprocess
+import asyncio
+import multiprocessing
+import atexit
+import socket
+import threading
 import time
+import PIL
 from PIL import Image
 import io
 import re
 import json
+import mimetypes
+import hashlib
+import uuid
+import glob
+import queue
 from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
 import base64
 
 app = Flask(__name__)
 CORS(app)
 
+MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB
+
+def _tmpfs_has_room(path):
+    """Check a tmpfs can hold an input, its output and the chunk files of a max-size upload"""
+    try:
+        return os.access(path, os.W_OK) and shutil.disk_usage(path).free >= 4 * MAX_CONTENT_LENGTH
+    except OSError:
+        return False
+
 # Cross-platform path handling
-UPLOAD_FOLDER = tempfile.gettempdir()
+# Prefer an in-memory tmpfs so uploads and outputs never touch disk. In Docker,
+# mount one and point CONVERTER_TMPFS at it: --tmpfs /dev/shm/converter:size=512m
+# (Docker's default 64MB /dev/shm is too small and falls back to disk).
+# Either way the folder is ours alone - the orphan sweep deletes stale files in it
+if os.environ.get('CONVERTER_TMPFS'):
+    UPLOAD_FOLDER = os.environ['CONVERTER_TMPFS']
+elif _tmpfs_has_room('/dev/shm'):
+    UPLOAD_FOLDER = '/dev/shm/converter'
+else:
+    UPLOAD_FOLDER = os.path.join(tempfile.gettempdir(), 'converter')
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 ALLOWED_EXTENSIONS = {
     'pdf', 'docx', 'doc', 'txt',
     'jpg', 'jpeg', 'png', 'webp', 'gif', 'bmp', 'tiff', 'svg'
 }
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
-app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+
+# Formats missing from (or inconsistent across) platform MIME tables
+for _ext, _mime in (
+    ('.docx', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+    ('.doc', 'application/msword'),
+    ('.webp', 'image/webp'),
+    ('.bmp', 'image/bmp'),
+    ('.tif', 'image/tiff'),
+    ('.tiff', 'image/tiff'),
+    ('.svg', 'image/svg+xml'),
+):
+    mimetypes.add_type(_mime, _ext)
+
+# PDFs above this many pages are converted in parallel page-range chunks, given at least
+# two chunk workers - one worker is slower than a single pdf2docx pass
+CHUNKED_PDF_MIN_PAGES = 20
+CHUNK_WORKERS = int(os.environ.get('CHUNK_WORKERS', min(os.cpu_count() or 1, 8)))
+
+# Precompiled patterns
+_HEADING_KW = re.compile(r'^(CHAPTER|SECTION|PART|ABSTRACT|INTRODUCTION|CONCLUSION)', re.IGNORECASE)
+_HEADING_NUM = re.compile(r'^\d+\.\s+[A-Z]')
+_HEADING_ROMAN = re.compile(r'^[IVX]+\.\s+[A-Z]')
+_UNSAFE_CHARS = re.compile(r'[<>:"/\\|?*]')
+
+# Pillow-SIMD is a drop-in Pillow build with vectorized resize/composite/encode
+PILLOW_SIMD = 'post' in PIL.__version__
+print(f"🖼️ Image engine: {'Pillow-SIMD' if PILLOW_SIMD else 'Pillow'} {PIL.__version__}")
+
+# Reject decompression bombs (~8k x 8k) before Pillow allocates the pixels
+Image.MAX_IMAGE_PIXELS = 64_000_000
+
+# Optional libvips for faster WEBP encoding
+try:
+    import pyvips
+except Exception:
+    pyvips = None
+
+# Persistent LibreOffice listener (unoserver), started by gunicorn.conf.py
+UNO_HOST = os.environ.get('UNO_HOST', '127.0.0.1')
+UNO_PORT = int(os.environ.get('UNO_PORT', 2003))
+UNO_SOFFICE_PORT = int(os.environ.get('UNO_SOFFICE_PORT', 2002))
+
+# Last-resort methods whose plain-text output mustn't be cached in place of a real conversion
+FALLBACK_METHODS = {'_pdf_to_docx_basic_fallback', '_docx_to_pdf_pymupdf'}
+
+class ImageTooLargeError(ValueError):
+    """Raised when an image exceeds Image.MAX_IMAGE_PIXELS"""
 
 class ProfessionalDocumentConverter:
     """Professional document converter with advanced features"""
     
     def __init__(self):
         self.supported_conversions = self.get_supported_conversions()
+        # One warm Word instance per thread - COM objects are bound to their apartment
+        self._word_local = threading.local()
+        self._word_apps = []
+        self._word_lock = threading.Lock()
+        # Name of the method that produced this thread's last result
+        self._method_local = threading.local()
+        atexit.register(self._quit_word_apps)
+    
+    def take_method(self) -> Optional[str]:
+        """Return and clear the method name recorded for this thread's last conversion"""
+        name = getattr(self._method_local, 'name', None)
+        self._method_local.name = None
+        return name
     
     def convert_pdf_to_docx(self, pdf_path: str, docx_path: str) -> str:
         """Professional PDF to DOCX with multiple fallbacks"""
@@ -47,11 +140,18 @@ class ProfessionalDocumentConverter:
             self._pdf_to_docx_basic_fallback     # Basic fallback
         ]
         
+        # Large documents: convert page ranges in parallel, then merge
+        if CHUNK_WORKERS >= 2:
+            with fitz.open(pdf_path) as pdf_doc:
+                if len(pdf_doc) > CHUNKED_PDF_MIN_PAGES:
+                    methods.insert(0, self._pdf_to_docx_chunked)
+        
         last_error = None
         for method in methods:
             try:
                 result = method(pdf_path, docx_path)
                 if result and os.path.exists(result):
+                    self._method_local.name = method.__name__
                     return result
             except Exception as e:
                 last_error = e
@@ -70,16 +170,55 @@ class ProfessionalDocumentConverter:
         except Exception as e:
             raise Exception(f"pdf2docx failed: {str(e)}")
     
-    def _pdf_to_docx_advanced_pymupdf(self, pdf_path: str, docx_path: str) -> str:
+    def _pdf_to_docx_chunked(self, pdf_path: str, docx_path: str, chunk_pages: int = 8) -> str:
+        """pdf2docx on page-range chunks in parallel processes, merged with docxcompose"""
+        chunk_paths = []
+        try:
+            from docxcompose.composer import Composer
+            
+            # Split into standalone chunk PDFs
+            base = os.path.join(UPLOAD_FOLDER, f"chunk_{uuid.uuid4().hex[:12]}")
+            with fitz.open(pdf_path) as src:
+                for index, start in enumerate(range(0, len(src), chunk_pages)):
+                    chunk_pdf = f"{base}_{index}.pdf"
+                    chunk_docx = f"{base}_{index}.docx"
+                    chunk_paths += [chunk_pdf, chunk_docx]
+                    with fitz.open() as chunk:
+                        chunk.insert_pdf(src, from_page=start, to_page=min(start + chunk_pages, len(src)) - 1)
+                        chunk.save(chunk_pdf)
+            
+            tasks = list(zip(chunk_paths[0::2], chunk_paths[1::2]))
+            with ProcessPoolExecutor(max_workers=min(CHUNK_WORKERS, len(tasks))) as executor:
+                chunk_docxs = list(executor.map(_convert_pdf_chunk, tasks))
+            
+            # Merge in page order
+            composer = Composer(Document(chunk_docxs[0]))
+            for chunk_docx in chunk_docxs[1:]:
+                composer.append(Document(chunk_docx))
+            composer.save(docx_path)
+            return docx_path
+        except Exception as e:
+            raise Exception(f"Chunked pdf2docx failed: {str(e)}")
+        finally:
+            for path in chunk_paths:
+                cleanup_file(path)
+    
+    def _pdf_to_docx_advanced_pymupdf(self, pdf_path: str, docx_path: str,
+                                      num_workers: Optional[int] = None) -> str:
         """Advanced PyMuPDF conversion with images and formatting"""
-        pdf_doc = fitz.open(pdf_path)
+        with fitz.open(pdf_path) as pdf_doc:
+            page_count = len(pdf_doc)
+        
         word_doc = Document()
         
         # Set document properties
         word_doc.core_properties.title = "Converted PDF Document"
         
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc.load_page(page_num)
+        image_cache: Dict[int, bytes] = {}
+        
+        # Pages are extracted in worker processes; python-docx stays in this process
+        for page_data in _map_pages(_extract_page, pdf_path, page_count, num_workers):
+            page_num = page_data["page_num"]
             
             # Add page break for subsequent pages
             if page_num > 0:
@@ -88,14 +227,13 @@ class ProfessionalDocumentConverter:
             # Add page header
             self._add_page_header(word_doc, page_num + 1)
             
-            # Extract and embed images
-            self._extract_and_embed_images(word_doc, page, pdf_doc)
+            # Embed extracted images
+            self._extract_and_embed_images(word_doc, page_data["images"], image_cache)
             
-            # Extract text with advanced formatting
-            self._extract_text_with_formatting(word_doc, page)
+            # Add text with advanced formatting
+            self._extract_text_with_formatting(word_doc, page_data["lines"])
         
         word_doc.save(docx_path)
-        pdf_doc.close()
         return docx_path
     
     def _pdf_to_docx_basic_fallback(self, pdf_path: str, docx_path: str) -> str:
@@ -113,8 +251,7 @@ class ProfessionalDocumentConverter:
                 
                 word_doc.add_heading(f'Page {page_num + 1}', level=2)
                 
-                paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-                for para in paragraphs:
+                for para in _paragraphs(text):
                     if self._is_heading(para):
                         word_doc.add_heading(para, level=3)
                     else:
@@ -133,86 +270,104 @@ class ProfessionalDocumentConverter:
         header_run.font.color.rgb = RGBColor(128, 128, 128)
         header.alignment = WD_ALIGN_PARAGRAPH.CENTER
     
-    def _extract_and_embed_images(self, doc: Document, page, pdf_doc):
-        """Extract and embed images from PDF page"""
-        image_list = page.get_images()
-        
-        for img_index, img in enumerate(image_list):
+    def _extract_and_embed_images(self, doc: Document, images: List[Tuple[int, Optional[bytes]]],
+                                  image_cache: Dict[int, bytes]):
+        """Embed images extracted from a PDF page"""
+        for img_index, (xref, img_data) in enumerate(images):
+            # Workers send each xref's bytes once per PDF; reuse them for repeats
+            if img_data is None:
+                img_data = image_cache.get(xref)
+                if img_data is None:
+                    continue
+            else:
+                image_cache[xref] = img_data
+            
             try:
-                xref = img[0]
-                pix = fitz.Pixmap(pdf_doc, xref)
-                
-                if pix.n - pix.alpha < 4:  # RGB or CMYK
-                    img_data = pix.tobytes("png")
-                    
-                    # Save temporarily with cross-platform path
-                    temp_img_path = os.path.join(tempfile.gettempdir(), f"temp_img_{img_index}_{int(time.time())}.png")
-                    with open(temp_img_path, 'wb') as temp_img:
-                        temp_img.write(img_data)
-                    
-                    # Add image to document
-                    paragraph = doc.add_paragraph()
-                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    run = paragraph.add_run()
-                    run.add_picture(temp_img_path, width=Inches(4.0))
-                    
-                    # Add caption
-                    caption = doc.add_paragraph()
-                    caption_run = caption.add_run(f"[Image {img_index + 1}]")
-                    caption_run.font.size = Pt(9)
-                    caption_run.font.italic = True
-                    caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                    
-                    # Cleanup
-                    if os.path.exists(temp_img_path):
-                        os.remove(temp_img_path)
+                # Add image to document straight from memory
+                paragraph = doc.add_paragraph()
+                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                run = paragraph.add_run()
+                run.add_picture(io.BytesIO(img_data), width=Inches(4.0))
                 
-                pix = None
+                # Add caption
+                caption = doc.add_paragraph()
+                caption_run = caption.add_run(f"[Image {img_index + 1}]")
+                caption_run.font.size = Pt(9)
+                caption_run.font.italic = True
+                caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
             except Exception as e:
                 print(f"Image extraction error: {e}")
                 continue
     
-    def _extract_text_with_formatting(self, doc: Document, page):
-        """Extract text with advanced formatting preservation"""
-        text_blocks = page.get_text("dict")
-        
-        for block in text_blocks.get("blocks", []):
-            if "lines" in block:
-                for line in block["lines"]:
-                    paragraph = doc.add_paragraph()
-                    
-                    for span in line["spans"]:
-                        text = span["text"].strip()
-                        if not text:
-                            continue
-                        
-                        run = paragraph.add_run(text + " ")
-                        
-                        # Apply advanced formatting
-                        font_size = span["size"]
-                        if font_size > 10:  # Only adjust if significantly different
-                            run.font.size = Pt(min(font_size, 36))
-                        
-                        # Bold formatting
-                        if span["flags"] & 2:
-                            run.font.bold = True
-                        
-                        # Italic formatting
-                        if span["flags"] & 1:
-                            run.font.italic = True
-                        
-                        # Font color (basic implementation)
-                        if span["color"] != 0:
-                            try:
-                                color = self._convert_pdf_color(span["color"])
-                                run.font.color.rgb = color
-                            except:
-                                pass
-                    
-                    # Set paragraph formatting
-                    if paragraph.text.strip():
-                        paragraph.paragraph_format.space_after = Pt(8)
-                        paragraph.paragraph_format.line_spacing = 1.15
+    def _extract_text_with_formatting(self, doc: Document, lines: List[List[Dict]]):
+        """Add extracted text with advanced formatting preservation"""
+        for spans in lines:
+            runs = []
+            
+            for span in spans:
+                text = span["text"].strip()
+                if not text:
+                    continue
+                
+                # Apply advanced formatting
+                font_size = span["size"]
+                size_pt = min(font_size, 36) if font_size > 10 else None  # Only adjust if significantly different
+                
+                # Font color (basic implementation)
+                color_hex = None
+                if span["color"] != 0:
+                    try:
+                        color_hex = str(self._convert_pdf_color(span["color"]))
+                    except:
+                        pass
+                
+                runs.append(self._build_run_xml(
+                    text + " ",
+                    size_pt=size_pt,
+                    bold=bool(span["flags"] & 2),
+                    italic=bool(span["flags"] & 1),
+                    color_hex=color_hex
+                ))
+            
+            paragraph = doc.add_paragraph()
+            
+            # Append pre-built runs in one go instead of python-docx's per-property setters
+            p_elem = paragraph._p
+            for run in runs:
+                p_elem.append(run)
+            
+            # Set paragraph formatting
+            if runs:
+                paragraph.paragraph_format.space_after = Pt(8)
+                paragraph.paragraph_format.line_spacing = 1.15
+    
+    def _build_run_xml(self, text: str, size_pt: Optional[float] = None, bold: bool = False,
+                       italic: bool = False, color_hex: Optional[str] = None):
+        """Build a <w:r> element with its <w:rPr> directly"""
+        run = OxmlElement('w:r')
+        
+        # Children follow the CT_RPr schema order: b, i, color, sz
+        if size_pt or bold or italic or color_hex:
+            rpr = OxmlElement('w:rPr')
+            if bold:
+                rpr.append(OxmlElement('w:b'))
+            if italic:
+                rpr.append(OxmlElement('w:i'))
+            if color_hex:
+                color = OxmlElement('w:color')
+                color.set(qn('w:val'), color_hex)
+                rpr.append(color)
+            if size_pt:
+                sz = OxmlElement('w:sz')
+                sz.set(qn('w:val'), str(int(round(size_pt * 2))))  # half-points
+                rpr.append(sz)
+            run.append(rpr)
+        
+        t = OxmlElement('w:t')
+        t.set(qn('xml:space'), 'preserve')
+        t.text = text
+        run.append(t)
+        return run
     
     def _convert_pdf_color(self, pdf_color: int) -> RGBColor:
         """Convert PDF color to RGB (simplified)"""
@@ -225,13 +380,15 @@ class ProfessionalDocumentConverter:
     def _is_heading(self, text: str) -> bool:
         """Detect if text is likely a heading"""
         text = text.strip()
-        return (
-            len(text) < 150 and
-            (text.isupper() or
-             text.endswith(':') or
-             re.match(r'^(CHAPTER|SECTION|PART|ABSTRACT|INTRODUCTION|CONCLUSION)', text, re.IGNORECASE) or
-             re.match(r'^\d+\.\s+[A-Z]', text) or
-             re.match(r'^[IVX]+\.\s+[A-Z]', text))
+        if len(text) >= 150:
+            return False
+        # Cheap string tests run before any regex
+        return bool(
+            text.isupper() or
+            text.endswith(':') or
+            _HEADING_KW.match(text) or
+            _HEADING_NUM.match(text) or
+            _HEADING_ROMAN.match(text)
         )
     
     def convert_docx_to_pdf(self, docx_path: str, pdf_path: str) -> str:
@@ -247,6 +404,7 @@ class ProfessionalDocumentConverter:
             try:
                 result = method(docx_path, pdf_path)
                 if result and os.path.exists(result):
+                    self._method_local.name = method.__name__
                     return result
             except Exception as e:
                 last_error = e
@@ -260,30 +418,96 @@ class ProfessionalDocumentConverter:
             raise Exception("Windows Word conversion only available on Windows")
         
         try:
-            pythoncom.CoInitialize()
-            word = win32com.client.Dispatch("Word.Application")
-            word.Visible = False
+            word = self._get_word_app()
             
             abs_docx_path = os.path.abspath(docx_path)
             abs_pdf_path = os.path.abspath(pdf_path)
             
-            doc = word.Documents.Open(abs_docx_path)
-            doc.SaveAs(abs_pdf_path, FileFormat=17)  # PDF format
-            doc.Close()
-            word.Quit()
+            try:
+                doc = word.Documents.Open(abs_docx_path)
+            except Exception:
+                # A bad upload fails here too; only replace Word if it actually died
+                if not self._word_alive(word):
+                    self._drop_word_app(word)
+                raise
+            try:
+                doc.SaveAs(abs_pdf_path, FileFormat=17)  # PDF format
+            finally:
+                doc.Close(SaveChanges=0)
             
             return pdf_path
         except Exception as e:
             raise Exception(f"Windows Word conversion failed: {str(e)}")
-        finally:
+    
+    def _get_word_app(self):
+        """Get this thread's Word instance, starting one if needed"""
+        local = self._word_local
+        if not getattr(local, 'com_initialized', False):
+            # Kept initialized for the thread's lifetime so the cached app stays valid
+            pythoncom.CoInitialize()
+            local.com_initialized = True
+        
+        word = getattr(local, 'app', None)
+        if word is not None:
+            if self._word_alive(word):
+                return word
+            self._drop_word_app(word)
+        
+        # Out-of-process instance isolated from any interactive Word session
+        word = win32com.client.DispatchEx("Word.Application")
+        word.Visible = False
+        word.DisplayAlerts = 0
+        local.app = word
+        with self._word_lock:
+            self._word_apps.append(word)
+        return word
+    
+    @staticmethod
+    def _word_alive(word) -> bool:
+        """Check whether a Word instance still responds"""
+        try:
+            word.Visible  # Raises if Word has exited or crashed
+            return True
+        except Exception:
+            return False
+    
+    def _drop_word_app(self, word):
+        """Forget this thread's Word instance and quit it if it is still running"""
+        self._word_local.app = None
+        with self._word_lock:
+            if word in self._word_apps:
+                self._word_apps.remove(word)
+        try:
+            word.Quit()
+        except Exception:
+            pass
+    
+    def _quit_word_apps(self):
+        """Quit cached Word instances on shutdown"""
+        with self._word_lock:
+            apps, self._word_apps = self._word_apps, []
+        for word in apps:
             try:
-                pythoncom.CoUninitialize()
-            except:
+                word.Quit()
+            except Exception:
                 pass
     
     def _docx_to_pdf_libreoffice(self, docx_path: str, pdf_path: str) -> str:
         """Use LibreOffice for cross-platform conversion"""
         try:
+            # Prefer the warm soffice instance - avoids seconds of start-up per request.
+            # Only health-checked here: whoever started it (gunicorn's master) restarts it
+            if uno_server_alive():
+                try:
+                    result = asyncio.run(_run_libreoffice(
+                        ['unoconvert', '--host', UNO_HOST, '--port', str(UNO_PORT), docx_path, pdf_path],
+                        timeout=120
+                    ))
+                    if result.returncode == 0 and os.path.exists(pdf_path):
+                        return pdf_path
+                except (subprocess.TimeoutExpired, FileNotFoundError):
+                    pass
+            
             output_dir = os.path.dirname(pdf_path)
             
             commands = [
@@ -293,7 +517,7 @@ class ProfessionalDocumentConverter:
             
             for cmd in commands:
                 try:
-                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+                    result = asyncio.run(_run_libreoffice(cmd, timeout=120))
                     if result.returncode == 0:
                         base_name = os.path.splitext(os.path.basename(docx_path))[0]
                         expected_pdf = os.path.join(output_dir, f"{base_name}.pdf")
@@ -338,35 +562,58 @@ class ProfessionalDocumentConverter:
         except Exception as e:
             raise Exception(f"PyMuPDF fallback failed: {str(e)}")
     
-    def convert_image(self, image_buffer: bytes, original_format: str, target_format: str) -> bytes:
+    def convert_image(self, image_buffer: bytes, original_format: str, target_format: str,
+                      quality: int = 85, effort: int = 4) -> bytes:
         """Professional image conversion with format optimization"""
+        # Same format in and out (incl. jpeg/jpg): return the bytes untouched,
+        # avoiding a decode and a lossy re-encode
+        src = original_format.lower().replace('jpeg', 'jpg').replace('tiff', 'tif')
+        dst = target_format.lower().replace('jpeg', 'jpg').replace('tiff', 'tif')
+        if src == dst:
+            return image_buffer
+        
         try:
             with Image.open(io.BytesIO(image_buffer)) as img:
+                # Only the header has been read so far - reject bombs before decoding
+                if img.size[0] * img.size[1] > Image.MAX_IMAGE_PIXELS:
+                    raise ImageTooLargeError("image too large")
+                
+                # libvips streams tiles and encodes WEBP with SIMD; Pillow is the fallback
+                if target_format.upper() == 'WEBP' and pyvips is not None:
+                    try:
+                        return pyvips.Image.new_from_buffer(image_buffer, "").webpsave_buffer(Q=quality, effort=effort)
+                    except Exception as e:
+                        print(f"libvips WEBP encode failed, using Pillow: {e}")
+                
                 output_buffer = io.BytesIO()
                 
                 # Handle format-specific optimizations
                 if target_format.upper() in ['JPEG', 'JPG']:
-                    # Convert RGBA to RGB for JPEG
+                    # Convert RGBA to RGB for JPEG (paste is vectorized under Pillow-SIMD)
                     if img.mode in ('RGBA', 'LA', 'P'):
                         background = Image.new('RGB', img.size, (255, 255, 255))
                         if img.mode == 'P':
                             img = img.convert('RGBA')
                         background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
                         img = background
-                    img.save(output_buffer, format='JPEG', quality=95, optimize=True)
+                    img.save(output_buffer, format='JPEG', quality=quality, optimize=True)
                 
                 elif target_format.upper() == 'PNG':
-                    img.save(output_buffer, format='PNG', optimize=True)
+                    img.save(output_buffer, format='PNG', optimize=False, compress_level=6)
                 
                 elif target_format.upper() == 'WEBP':
-                    img.save(output_buffer, format='WEBP', quality=90, method=6)
+                    img.save(output_buffer, format='WEBP', quality=quality, method=effort)
                 
                 else:
                     img.save(output_buffer, format=target_format.upper())
                 
                 output_buffer.seek(0)
                 return output_buffer.getvalue()
-                
+        
+        except ImageTooLargeError:
+            raise
+        except Image.DecompressionBombError as e:
+            raise ImageTooLargeError(f"image too large: {str(e)}")
         except Exception as e:
             raise Exception(f"Image conversion failed: {str(e)}")
     
@@ -397,13 +644,180 @@ class ProfessionalDocumentConverter:
 # Initialize converter
 converter = ProfessionalDocumentConverter()
 
+def _paragraphs(text):
+    """Yield blank-line separated paragraphs in a single pass over the text"""
+    buf = []
+    for line in text.splitlines():
+        if line.strip():
+            buf.append(line)
+        elif buf:
+            yield '\n'.join(buf).strip()
+            buf = []
+    if buf:
+        yield '\n'.join(buf).strip()
+
+_uno_server = None
+_uno_lock = threading.Lock()
+
+async def _run_libreoffice(cmd, timeout):
+    """Run a LibreOffice command without a blocking subprocess.run, killing it on timeout"""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    return subprocess.CompletedProcess(
+        cmd, proc.returncode,
+        stdout.decode(errors='replace'), stderr.decode(errors='replace')
+    )
+
+def uno_server_alive():
+    """Check whether the persistent unoserver is accepting connections"""
+    try:
+        with socket.create_connection((UNO_HOST, UNO_PORT), timeout=1):
+            return True
+    except OSError:
+        return False
+
+def start_uno_server(wait_seconds=10):
+    """Start the persistent unoserver for a standalone run (under gunicorn the master owns it)"""
+    global _uno_server
+    if uno_server_alive():
+        return True
+    
+    with _uno_lock:
+        if uno_server_alive():
+            return True
+        
+        try:
+            _uno_server = subprocess.Popen(
+                ['unoserver', '--interface', UNO_HOST, '--port', str(UNO_PORT),
+                 '--uno-port', str(UNO_SOFFICE_PORT)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            _uno_server = None
+            return False
+        
+        deadline = time.time() + wait_seconds
+        while time.time() < deadline:
+            if uno_server_alive():
+                return True
+            if _uno_server.poll() is not None:
+                break
+            time.sleep(0.2)
+        return False
+
+def _stop_uno_server():
+    """Stop the unoserver this process started, if any"""
+    if _uno_server is not None and _uno_server.poll() is None:
+        _uno_server.terminate()
+
+atexit.register(_stop_uno_server)
+
+# Content-addressed result cache: {sha256(input)}_{target_format}.out + .meta
+# Kept on disk, not in the RAM-backed UPLOAD_FOLDER, so cached results can't crowd out uploads
+CACHE_DIR = os.environ.get('CONVERTER_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'converter-cache'))
+os.makedirs(CACHE_DIR, exist_ok=True)
+# Never let the cache take more than a quarter of its filesystem
+CACHE_MAX_BYTES = min(
+    int(os.environ.get('CONVERTER_CACHE_MAX_BYTES', 2 * 1024 * 1024 * 1024)),  # 2GB
+    shutil.disk_usage(CACHE_DIR).total // 4
+)
+_cache_evict_event = threading.Event()
+
+def file_sha256(path):
+    """Hash a file's contents (OpenSSL-backed, uses SHA-NI where available)"""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+def _cache_paths(key):
+    return os.path.join(CACHE_DIR, f"{key}.out"), os.path.join(CACHE_DIR, f"{key}.meta")
+
+def cache_lookup(key):
+    """Return (output_path, meta) for a cached conversion, or None"""
+    out_path, meta_path = _cache_paths(key)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if not os.path.exists(out_path):
+            return None
+        os.utime(out_path)  # Mark as recently used
+        return out_path, meta
+    except (OSError, ValueError):
+        return None
+
+def _cache_tmp_path(key):
+    return os.path.join(CACHE_DIR, f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+def cache_store_file(key, src_path, meta):
+    """Move a finished output staged in CACHE_DIR into the cache and return its cached path"""
+    out_path, meta_path = _cache_paths(key)
+    try:
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(src_path, out_path)
+    except OSError as e:
+        # src_path is left in place so the caller can still serve it
+        print(f"Warning: Could not cache {src_path}: {e}")
+        cleanup_file(meta_path)
+        return None
+    _cache_evict_event.set()
+    return out_path
+
+def cache_store_bytes(key, data, meta):
+    """Write in-memory output to the cache"""
+    tmp_path = _cache_tmp_path(key)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+    except OSError as e:
+        print(f"Warning: Could not cache result: {e}")
+        cleanup_file(tmp_path)
+        return
+    if cache_store_file(key, tmp_path, meta) is None:
+        cleanup_file(tmp_path)
+
+def _cache_evictor():
+    """Background LRU cleanup: drop least recently used entries over CACHE_MAX_BYTES"""
+    while True:
+        _cache_evict_event.wait()
+        _cache_evict_event.clear()
+        try:
+            entries = []
+            total = 0
+            for entry in os.scandir(CACHE_DIR):
+                if entry.name.endswith('.out'):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+            
+            entries.sort()
+            for _, size, out_path in entries:
+                if total <= CACHE_MAX_BYTES:
+                    break
+                try:
+                    os.remove(out_path)
+                    cleanup_file(out_path[:-len('.out')] + '.meta')
+                    total -= size
+                except OSError:
+                    continue  # Still being sent (Windows) - try again next round
+        except Exception as e:
+            print(f"Cache eviction error: {e}")
+
+threading.Thread(target=_cache_evictor, daemon=True).start()
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def get_safe_filename(filename):
     """Create a safe filename for cross-platform use"""
     # Remove unsafe characters and replace spaces
-    safe_name = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    safe_name = _UNSAFE_CHARS.sub('_', filename)
     safe_name = safe_name.replace(' ', '_')
     return secure_filename(safe_name)
 
@@ -436,12 +850,22 @@ def convert_file():
         
         if not target_format:
             return jsonify({"error": "Target format not specified"}), 400
+        
+        # Image encoder knobs: quality 1-100 (JPEG/WEBP), effort 0-6 (WEBP)
+        try:
+            quality = min(max(int(request.form.get('quality', 85)), 1), 100)
+            effort = min(max(int(request.form.get('effort', 4)), 0), 6)
+        except ValueError:
+            return jsonify({"error": "quality and effort must be integers"}), 400
 
         # Create safe filenames with cross-platform paths
         safe_filename = get_safe_filename(file.filename)
-        input_path = os.path.join(UPLOAD_FOLDER, f"input_{int(time.time())}_{safe_filename}")
+        now = int(time.time())
+        req_id = uuid.uuid4().hex[:12]  # Unique even for requests in the same second
+        input_path = os.path.join(UPLOAD_FOLDER, f"input_{req_id}_{safe_filename}")
         output_filename = f"converted_{os.path.splitext(safe_filename)[0]}.{target_format}"
-        output_path = os.path.join(UPLOAD_FOLDER, f"output_{int(time.time())}_{output_filename}")
+        # Written straight into CACHE_DIR so caching it is a rename, not a copy
+        output_path = os.path.join(CACHE_DIR, f"output_{req_id}_{output_filename}")
         
         # Save uploaded file
         file.save(input_path)
@@ -452,55 +876,93 @@ def convert_file():
         
         print(f"File saved successfully: {input_path}")
         print(f"File size: {os.path.getsize(input_path)} bytes")
-
-        # Determine file type and perform conversion
-        mime_type = get_mime_type(file.filename)
         
-        if mime_type.startswith('image/'):
-            # Image conversion - handle in memory
+        # Determine file type
+        src_mime = get_mime_type(file.filename)
+        mime_type = get_mime_type(f"file.{target_format}")
+        
+        # Serve repeated conversions of identical content from the cache
+        cache_key = f"{file_sha256(input_path)}_{target_format}"
+        if src_mime.startswith('image/'):
+            cache_key += f"_q{quality}_e{effort}"
+        cached = cache_lookup(cache_key)
+        if cached:
+            cached_path, meta = cached
+            response = send_file(
+                cached_path,
+                as_attachment=True,
+                download_name=get_output_filename(file.filename, target_format, now),
+                mimetype=meta['mimetype'],
+                conditional=True
+            )
+            response.headers['X-Conversion-Status'] = 'success'
+            response.headers['X-Conversion-Engine'] = 'professional-python-converter'
+            response.headers['X-Conversion-Cache'] = 'hit'
+            return response
+
+        # Perform conversion
+        if src_mime.startswith('image/'):
+            # Image conversion - handle in memory (save() consumed the stream, so rewind)
+            file.stream.seek(0)
             file_buffer = file.read()
-            result_data = converter.convert_image(file_buffer, file.filename.split('.')[-1], target_format)
-            mime_type = f'image/{target_format}'
-            output_filename = get_output_filename(file.filename, target_format)
+            original_format = os.path.splitext(file.filename)[1][1:].lower()
+            result_data = converter.convert_image(file_buffer, original_format, target_format, quality, effort)
+            output_filename = get_output_filename(file.filename, target_format, now)
+            cache_store_bytes(cache_key, result_data, {'mimetype': mime_type})
+            
+            response = send_file(
+                io.BytesIO(result_data),
+                as_attachment=True,
+                download_name=output_filename,
+                mimetype=mime_type
+            )
             
         else:
             # Document conversion
-            if mime_type == 'application/pdf' and target_format == 'docx':
-                result_path = converter.convert_pdf_to_docx(input_path, output_path)
-            elif mime_type == 'application/pdf' and target_format == 'txt':
-                result_path = pdf_to_txt_advanced(input_path, output_path)
-            elif 'wordprocessingml' in mime_type and target_format == 'pdf':
-                result_path = converter.convert_docx_to_pdf(input_path, output_path)
-            elif 'wordprocessingml' in mime_type and target_format == 'txt':
-                result_path = docx_to_txt_advanced(input_path, output_path)
-            elif mime_type == 'text/plain' and target_format == 'pdf':
-                result_path = txt_to_pdf_advanced(input_path, output_path)
-            elif mime_type == 'text/plain' and target_format == 'docx':
-                result_path = txt_to_docx_advanced(input_path, output_path)
-            else:
-                return jsonify({"error": f"Unsupported conversion: {mime_type} to {target_format}"}), 400
+            convert = CONVERTERS.get((src_mime, target_format))
+            if convert is None:
+                return jsonify({"error": f"Unsupported conversion: {src_mime} to {target_format}"}), 400
+            result_path = convert(input_path, output_path)
+            method = converter.take_method()
             
             # Verify conversion worked
             if not os.path.exists(result_path):
                 raise Exception(f"Conversion failed - output file not created: {result_path}")
             
-            # Read result
-            with open(result_path, 'rb') as f:
-                result_data = f.read()
+            output_filename = get_output_filename(file.filename, target_format, now)
             
-            mime_type = get_mime_type(target_format)
-            output_filename = get_output_filename(file.filename, target_format)
-
-        response = send_file(
-            io.BytesIO(result_data),
-            as_attachment=True,
-            download_name=output_filename,
-            mimetype=mime_type
-        )
+            # Move the output into the cache, which then owns it - unless a last-resort
+            # fallback made it, so a transient Word/LibreOffice outage isn't cached
+            cached_path = None
+            if method not in FALLBACK_METHODS:
+                cached_path = cache_store_file(cache_key, result_path, {'mimetype': mime_type})
+            
+            # Serve straight from disk (sendfile under gunicorn) rather than reading into memory
+            response = send_file(
+                cached_path or result_path,
+                as_attachment=True,
+                download_name=output_filename,
+                mimetype=mime_type,
+                conditional=True
+            )
+            
+            if cached_path is None:
+                # The output must outlive this function - delete it once the response is sent
+                response.call_on_close(lambda: cleanup_file(result_path))
+                if result_path == output_path:
+                    output_path = None
+            elif result_path == output_path:
+                output_path = None
+            else:
+                cleanup_file(result_path)
+        
         response.headers['X-Conversion-Status'] = 'success'
         response.headers['X-Conversion-Engine'] = 'professional-python-converter'
+        response.headers['X-Conversion-Cache'] = 'miss'
         return response
 
+    except ImageTooLargeError as e:
+        return jsonify({"error": f"Conversion failed: {str(e)}"}), 413
     except Exception as e:
         print(f"Conversion error: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
@@ -552,40 +1014,186 @@ def get_capabilities():
         "data": capabilities
     })
 
+# Per-page PDF workers. Only long PDFs get a pool (MIN_PARALLEL_PAGES), so busy hosts
+# running many short conversions at once aren't oversubscribed
+DEFAULT_PAGE_WORKERS = int(os.environ.get('PAGE_WORKERS', min(os.cpu_count() or 1, 8)))
+MIN_PARALLEL_PAGES = 16  # smaller PDFs finish before a process pool would start
+
+# Image streams python-docx can embed as-is
+EMBEDDABLE_IMAGE_EXTS = {'png', 'jpeg', 'jpg'}
+
+# Per-worker record of failed and already-returned xrefs, reset for each conversion.
+# Thread-local because single-worker runs happen on the request thread.
+_xref_state = threading.local()
+
+def _init_page_worker():
+    """Start a conversion with no xrefs skipped or sent (pool initializer, or before a serial run)"""
+    _xref_state.skip = set()
+    _xref_state.sent = set()
+
+def _extract_image_bytes(pdf_doc, xref):
+    """Get embeddable image bytes for an xref, avoiding a re-encode when possible"""
+    # Raw JPEG/PNG streams in Gray/RGB can be embedded without decoding
+    try:
+        info = pdf_doc.extract_image(xref)
+    except Exception:
+        info = None
+    if info and info.get("ext") in EMBEDDABLE_IMAGE_EXTS and info.get("colorspace") in (1, 3):
+        return info["image"]
+    
+    # Fallback: decode to a Pixmap, converting CMYK and other colorspaces to RGB
+    pix = fitz.Pixmap(pdf_doc, xref)
+    if pix.n - pix.alpha >= 4:
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    return pix.tobytes("png")
+
+def _extract_page(args):
+    """Extract spans and images from one PDF page (runs in a worker process)"""
+    pdf_path, page_num = args
+    # Each worker opens its own handle - fitz.Document must not cross processes
+    with fitz.open(pdf_path) as pdf_doc:
+        page = pdf_doc.load_page(page_num)
+        
+        images = []
+        skip_xrefs, sent_xrefs = _xref_state.skip, _xref_state.sent
+        for img in page.get_images():
+            xref = img[0]
+            if xref in skip_xrefs:
+                continue
+            # Repeated images (logos, headers) are decoded once; this process
+            # handles pages in order, so the parent already has the bytes
+            if xref in sent_xrefs:
+                images.append((xref, None))
+                continue
+            try:
+                images.append((xref, _extract_image_bytes(pdf_doc, xref)))
+                sent_xrefs.add(xref)
+            except Exception as e:
+                print(f"Image extraction error: {e}")
+                skip_xrefs.add(xref)
+                continue
+        
+        lines = []
+        for block in page.get_text("dict").get("blocks", []):
+            for line in block.get("lines", []):
+                lines.append([
+                    {
+                        "text": span["text"],
+                        "size": span["size"],
+                        "flags": span["flags"],
+                        "color": span["color"],
+                    }
+                    for span in line["spans"]
+                ])
+    
+    return {"page_num": page_num, "lines": lines, "images": images}
+
+def _convert_pdf_chunk(args):
+    """Convert one chunk PDF with pdf2docx (runs in a worker process)"""
+    chunk_pdf, chunk_docx = args
+    from pdf2docx import Converter
+    cv = Converter(chunk_pdf)
+    try:
+        cv.convert(chunk_docx, start=0, end=None, multi_processing=False)
+    finally:
+        cv.close()
+    return chunk_docx
+
+def _extract_page_text(args):
+    """Extract layout-sorted text from one PDF page (runs in a worker process)"""
+    pdf_path, page_num = args
+    with fitz.open(pdf_path) as pdf_doc:
+        return pdf_doc.load_page(page_num).get_text("text", sort=True)
+
+def _map_pages(func, pdf_path, page_count, num_workers=None, chunksize=4):
+    """Apply func to every page, yielding results in page order"""
+    if num_workers is None:
+        num_workers = DEFAULT_PAGE_WORKERS
+    num_workers = min(num_workers, page_count)
+    tasks = [(pdf_path, i) for i in range(page_count)]
+    
+    # Not worth paying process start-up for a short document or a single worker
+    if num_workers <= 1 or page_count < MIN_PARALLEL_PAGES:
+        _init_page_worker()
+        yield from map(func, tasks)
+        return
+    
+    with multiprocessing.Pool(num_workers, initializer=_init_page_worker) as pool:
+        yield from pool.imap(func, tasks, chunksize=chunksize)
+
 # Additional advanced conversion functions
-def pdf_to_txt_advanced(pdf_path, txt_path):
+def pdf_to_txt_advanced(pdf_path, txt_path, num_workers=None):
     """Advanced PDF to text conversion"""
-    pdf_doc = fitz.open(pdf_path)
+    with fitz.open(pdf_path) as pdf_doc:
+        page_count = len(pdf_doc)
+    
     full_text = []
     
-    for page_num in range(len(pdf_doc)):
-        page = pdf_doc.load_page(page_num)
-        text = page.get_text("text", sort=True)
-        
+    for page_num, text in enumerate(_map_pages(_extract_page_text, pdf_path, page_count, num_workers)):
         if text.strip():
             full_text.append(f"\n{'='*50}")
             full_text.append(f"PAGE {page_num + 1}")
             full_text.append(f"{'='*50}\n")
             full_text.append(text.strip())
     
-    pdf_doc.close()
-    
     with open(txt_path, 'w', encoding='utf-8') as f:
         f.write('\n'.join(full_text))
     
     return txt_path
 
+# WordprocessingML lookups for DOCX text extraction
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W_T = f'{{{W_NS}}}t'
+W_TAB = f'{{{W_NS}}}tab'
+W_TYPE = f'{{{W_NS}}}type'
+W_STYLE_ID = f'{{{W_NS}}}styleId'
+# Same run content python-docx's Paragraph.text sees: direct and hyperlink runs
+_RUN_CONTENT = etree.XPath(
+    './w:r/*[self::w:t or self::w:tab or self::w:br or self::w:cr]'
+    ' | ./w:hyperlink/w:r/*[self::w:t or self::w:tab or self::w:br or self::w:cr]',
+    namespaces={'w': W_NS}
+)
+_PARAGRAPH_STYLE = etree.XPath('string(./w:pPr/w:pStyle/@w:val)', namespaces={'w': W_NS})
+_STYLE_NAMES = etree.XPath('/w:styles/w:style[w:name]', namespaces={'w': W_NS})
+_STYLE_NAME = etree.XPath('string(./w:name/@w:val)', namespaces={'w': W_NS})
+
+def _paragraph_text(p):
+    """Text of a w:p element, matching python-docx's Paragraph.text"""
+    parts = []
+    for el in _RUN_CONTENT(p):
+        if el.tag == W_T:
+            parts.append(el.text or '')
+        elif el.tag == W_TAB:
+            parts.append('\t')
+        elif el.get(W_TYPE, 'textWrapping') == 'textWrapping':
+            parts.append('\n')  # w:br / w:cr line breaks
+    return ''.join(parts)
+
+def _heading_levels(styles):
+    """Map heading style IDs to their level, e.g. {'Heading2': 2}"""
+    levels = {}
+    for style in _STYLE_NAMES(styles):
+        name = _STYLE_NAME(style)
+        if name.lower().startswith('heading'):
+            level = name.split()[-1]
+            levels[style.get(W_STYLE_ID)] = int(level) if level.isdigit() else 1
+    return levels
+
 def docx_to_txt_advanced(docx_path, txt_path):
     """Advanced DOCX to text conversion"""
     doc = Document(docx_path)
     full_text = []
     
-    for paragraph in doc.paragraphs:
-        text = paragraph.text.strip()
+    # Walk the body XML directly rather than building a Paragraph wrapper per <w:p>;
+    # heading levels come from style names, so localized style IDs still resolve
+    heading_levels = _heading_levels(doc.styles.element)
+    
+    for p in doc.element.body.iterfind(qn('w:p')):
+        text = _paragraph_text(p).strip()
         if text:
-            if paragraph.style.name.startswith('Heading'):
-                level = paragraph.style.name.split()[-1] if 'Heading' in paragraph.style.name else '1'
-                full_text.append(f"\n{'#' * int(level)} {text}")
+            level = heading_levels.get(_PARAGRAPH_STYLE(p))
+            if level:
+                full_text.append(f"\n{'#' * level} {text}")
             else:
                 full_text.append(text)
     
@@ -626,40 +1234,70 @@ def txt_to_docx_advanced(txt_path, docx_path):
     word_doc.save(docx_path)
     return docx_path
 
+# Document conversion dispatch: (source MIME type, target format) -> converter
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+CONVERTERS = {
+    ('application/pdf', 'docx'): converter.convert_pdf_to_docx,
+    ('application/pdf', 'txt'): pdf_to_txt_advanced,
+    (DOCX_MIME, 'pdf'): converter.convert_docx_to_pdf,
+    (DOCX_MIME, 'txt'): docx_to_txt_advanced,
+    ('text/plain', 'pdf'): txt_to_pdf_advanced,
+    ('text/plain', 'docx'): txt_to_docx_advanced,
+}
+
 def get_mime_type(filename):
     """Get MIME type from filename"""
-    ext = filename.split('.')[-1].lower()
-    mime_map = {
-        'pdf': 'application/pdf',
-        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'doc': 'application/msword',
-        'txt': 'text/plain',
-        'jpg': 'image/jpeg', 'jpeg': 'image/jpeg',
-        'png': 'image/png', 'webp': 'image/webp',
-        'gif': 'image/gif', 'bmp': 'image/bmp',
-        'tiff': 'image/tiff', 'tif': 'image/tiff',
-        'svg': 'image/svg+xml',
-    }
-    return mime_map.get(ext, 'application/octet-stream')
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
 
-def get_output_filename(original_name, target_format):
+def get_output_filename(original_name, target_format, timestamp=None):
     """Generate output filename"""
     base_name = original_name.rsplit('.', 1)[0]
-    timestamp = int(time.time())
+    if timestamp is None:
+        timestamp = int(time.time())
     return f"{base_name}-converted-{timestamp}.{target_format}"
 
+# Temp files are deleted on a background thread so responses don't wait on unlink
+ORPHAN_MAX_AGE = 60 * 60  # 1 hour
+_cleanup_q = queue.Queue()
+
 def cleanup_file(file_path):
-    """Cleanup temporary file"""
-    if file_path and os.path.exists(file_path):
-        try:
-            os.remove(file_path)
-        except Exception as e:
-            print(f"Warning: Could not delete {file_path}: {e}")
+    """Queue a temporary file for deletion"""
+    if file_path:
+        _cleanup_q.put_nowait(file_path)
+
+def _remove_orphans():
+    """Delete temp files left behind by crashed workers"""
+    cutoff = time.time() - ORPHAN_MAX_AGE
+    patterns = [os.path.join(UPLOAD_FOLDER, pattern) for pattern in ('input_*', 'output_*', 'chunk_*')]
+    # Outputs staged in the cache dir (and LibreOffice's intermediate files) plus interrupted cache writes
+    patterns += [os.path.join(CACHE_DIR, pattern) for pattern in ('input_*', 'output_*', '*.tmp')]
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except OSError:
+                continue
+
+def _reaper():
+    """Delete queued temp files"""
+    _remove_orphans()
+    while True:
+        file_path = _cleanup_q.get()
+        if os.path.exists(file_path):
+            try:
+                os.remove(file_path)
+            except Exception as e:
+                print(f"Warning: Could not delete {file_path}: {e}")
+
+threading.Thread(target=_reaper, daemon=True).start()
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     print(f"🚀 Starting Professional Document Converter on port {port}")
     print(f"📁 Temp directory: {UPLOAD_FOLDER}")
+    if os.name != 'nt' and start_uno_server():
+        print(f"📄 LibreOffice listener ready on {UNO_HOST}:{UNO_PORT}")
     print("✅ Features: Image extraction, Advanced formatting, Multiple fallbacks")
     print("✅ Supported: PDF, DOCX, DOC, TXT, JPG, PNG, WEBP, GIF, BMP, TIFF, SVG")
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
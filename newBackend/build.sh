@@ -18,6 +18,16 @@ else
     pip install -r requirements.txt --no-deps
 fi
 
+# Opt-in Pillow-SIMD (PILLOW_SIMD=1): it has no wheels, so it needs a C toolchain and
+# libjpeg/zlib headers. It replaces stock Pillow in place; keep Pillow if the build fails
+if [ "$PILLOW_SIMD" = "1" ]; then
+    pip uninstall -y pillow
+    if ! pip install --no-deps --force-reinstall pillow-simd==9.0.0.post1; then
+        echo "⚠️ Pillow-SIMD build failed, reinstalling stock Pillow..."
+        pip install --no-deps --force-reinstall pillow==10.0.1
+    fi
+fi
+
 # Final verification
 echo "🔍 Verifying installations..."
 python -c "
@@ -1,5 +1,9 @@
 # Gunicorn configuration file
 import multiprocessing
+import os
+import subprocess
+import threading
+import time
 
 max_requests = 1000
 max_requests_jitter = 50
@@ -7,13 +11,60 @@ log_file = "-"
 bind = "0.0.0.0:10000"
 
 # Worker processes
-workers = 1  # Free tier only allows 1 worker
-worker_class = "sync"
+# Threaded workers let one slow conversion overlap with other requests' I/O.
+# Set WEB_CONCURRENCY=1 on hosts that only allow a single worker (e.g. free tiers).
+workers = int(os.environ.get("WEB_CONCURRENCY", max(2, multiprocessing.cpu_count())))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
 worker_connections = 1000
 timeout = 120
 keepalive = 2
 
+# Keep worker heartbeat files in memory instead of on disk
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
 # Logging
 accesslog = "-"
 errorlog = "-"
-loglevel = "info"
\ No newline at end of file
+loglevel = "info"
+
+# Persistent LibreOffice
+# One headless soffice (driven through unoserver) is shared by all workers so
+# DOCX->PDF requests skip LibreOffice start-up. Only the master starts and restarts it;
+# workers just health-check it and fall back to the soffice CLI while it is down.
+UNO_RESTART_INTERVAL = 5  # seconds between liveness checks
+
+def _start_uno_server(server):
+    try:
+        server.uno_server = subprocess.Popen([
+            "unoserver",
+            "--interface", os.environ.get("UNO_HOST", "127.0.0.1"),
+            "--port", os.environ.get("UNO_PORT", "2003"),
+            "--uno-port", os.environ.get("UNO_SOFFICE_PORT", "2002"),
+        ])
+        server.log.info("Started unoserver (pid %s)", server.uno_server.pid)
+    except FileNotFoundError:
+        server.uno_server = None
+        server.log.warning("unoserver not installed; LibreOffice will start per request")
+
+def _watch_uno_server(server):
+    """Restart unoserver from the master whenever it exits"""
+    while not server.uno_stopping:
+        time.sleep(UNO_RESTART_INTERVAL)
+        uno_server = server.uno_server
+        if not server.uno_stopping and uno_server is not None and uno_server.poll() is not None:
+            server.log.warning("unoserver exited with code %s; restarting", uno_server.returncode)
+            _start_uno_server(server)
+
+def when_ready(server):
+    server.uno_stopping = False
+    _start_uno_server(server)
+    if server.uno_server is not None:
+        threading.Thread(target=_watch_uno_server, args=(server,), daemon=True).start()
+
+def on_exit(server):
+    server.uno_stopping = True
+    uno_server = getattr(server, "uno_server", None)
+    if uno_server is not None and uno_server.poll() is None:
+        uno_server.terminate()
\ No newline at end of file
@@ -1,31 +1,172 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, request, jsonify, send_file
 from flask_cors import CORS
 import os
 import tempfile
 from werkzeug.utils import secure_filename
-import traceback
 import fitz  # PyMuPDF
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
-import pythoncom
-import win32com.client
+from docx.oxml.ns import qn, nsdecls
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.shape import CT_Inline
+from lxml import etree
 import subprocess
 import time
-from PIL import Image
 import io
 import re
+import mmap
+import textwrap
+import zipfile
+import hashlib
+from xml.sax.saxutils import escape as xml_escape
+import shutil
+import threading
+import atexit
+import socket
+import sys
+import queue
+import logging
+import logging.handlers
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-app = Flask(__name__)
-CORS(app)
+# Records are queued and written by a background thread, off the conversion path
+logger = logging.getLogger("converter")
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+logger.propagate = False
+_log_handler = logging.StreamHandler(sys.stdout)
+_log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+_log_pid = None
+
+def start_log_listener():
+    """Start this process's background log writer (again after a fork)"""
+    global _log_pid
+    if _log_pid == os.getpid():
+        return
+    log_queue = queue.SimpleQueue()
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener = logging.handlers.QueueListener(log_queue, _log_handler)
+    listener.start()
+    # Flushed at exit in the main process and in pool workers alike
+    multiprocessing.util.Finalize(None, listener.stop, exitpriority=10)
+    _log_pid = os.getpid()
+
+start_log_listener()
 
 UPLOAD_FOLDER = tempfile.gettempdir()
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'doc', 'txt'}
+UPLOAD_BUFFER_SIZE = 1 << 20  # 1MB
+
+class StreamingRequest(Request):
+    """Request that writes file uploads straight to named files in UPLOAD_FOLDER"""
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        # A named file can be linked into place by save_upload instead of copied again
+        return tempfile.NamedTemporaryFile(prefix='upload_', dir=UPLOAD_FOLDER)
+
+def save_upload(stream, path):
+    """Give an upload its final path, hard-linking the spooled file so it's only written once"""
+    try:
+        stream.flush()
+        os.link(stream.name, path)
+    except (AttributeError, OSError):
+        # Not a file we spooled (or no hard links here): copy it
+        stream.seek(0)
+        with open(path, 'wb', buffering=UPLOAD_BUFFER_SIZE) as f:
+            shutil.copyfileobj(stream, f, length=UPLOAD_BUFFER_SIZE)
+
+app = Flask(__name__)
+app.request_class = StreamingRequest
+CORS(app)
+
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024
 
+# Behind nginx/Apache with X-Sendfile support, let the front-end send results with sendfile(2)
+app.use_x_sendfile = os.environ.get('USE_X_SENDFILE') == '1'
+X_SENDFILE_CLEANUP_DELAY = 300  # seconds - the front-end reads the file after we respond
+
+# Conversions run in a warm process pool so CPU-bound work doesn't serialize on the GIL
+CONVERSION_WORKERS = int(os.environ.get('CONVERSION_WORKERS', os.cpu_count() or 1))
+_executor = None
+_executor_lock = threading.Lock()
+
+def _preload():
+    """Import the heavy conversion libraries once per worker process"""
+    start_log_listener()
+    import fitz
+    import docx
+    try:
+        import pdf2docx
+    except ImportError:
+        pass
+
+def get_executor():
+    """Get the shared conversion process pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=CONVERSION_WORKERS, initializer=_preload)
+        return _executor
+
+def reset_executor():
+    """Drop a broken process pool so the next request starts a fresh one"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+# Shared python-docx lengths, built once instead of per image/page
+IMAGE_WIDTH = Inches(5.0)
+SMALL_FONT_SIZE = Pt(9)
+HEADER_COLOR = RGBColor(128, 128, 128)
+
+# Span font sizes: only sizes above MIN are kept, capped at MAX (points)
+MIN_SCALED_FONT_SIZE = 12
+MAX_FONT_SIZE = 36
+
+# Paragraph spacing: 8pt after (160 twips), 1.15 line spacing (276/240)
+PARAGRAPH_PPR_XML = '<w:pPr><w:spacing w:after="160" w:line="276" w:lineRule="auto"/></w:pPr>'
+_RPR_XML_CACHE = {}
+
+def _run_properties_xml(bold, italic, size, black):
+    """Get the <w:rPr> markup for a run, cached per distinct formatting"""
+    half_points = int(round(size * 2)) if size else None
+    key = (bold, italic, half_points, black)
+    rpr = _RPR_XML_CACHE.get(key)
+    if rpr is None:
+        # Children follow the CT_RPr schema order: b, i, color, sz
+        parts = []
+        if bold:
+            parts.append('<w:b/>')
+        if italic:
+            parts.append('<w:i/>')
+        if black:
+            parts.append('<w:color w:val="000000"/>')
+        if half_points:
+            parts.append(f'<w:sz w:val="{half_points}"/>')
+        rpr = f'<w:rPr>{"".join(parts)}</w:rPr>' if parts else ''
+        _RPR_XML_CACHE[key] = rpr
+    return rpr
+
+def _append_paragraphs_xml(word_doc, paragraphs_xml):
+    """Parse a batch of <w:p> markup once and add it to the end of the document body"""
+    if not paragraphs_xml:
+        return
+    
+    container = parse_xml(f'<w:body {nsdecls("w")}>{"".join(paragraphs_xml)}</w:body>')
+    body = word_doc.element.body
+    sect_pr = body.find(qn('w:sectPr'))
+    for p in list(container):
+        # Body content must stay ahead of the final section properties
+        if sect_pr is not None:
+            sect_pr.addprevious(p)
+        else:
+            body.append(p)
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -43,7 +184,7 @@ def convert_file():
     output_path = None
     
     try:
-        print("=== Starting Professional Conversion ===")
+        logger.info("=== Starting Professional Conversion ===")
         
         if 'file' not in request.files:
             return jsonify({"error": "No file provided"}), 400
@@ -51,8 +192,8 @@ def convert_file():
         file = request.files['file']
         target_format = request.form.get('targetFormat', '').lower()
         
-        print(f"File: {file.filename}")
-        print(f"Target format: {target_format}")
+        logger.info(f"File: {file.filename}")
+        logger.info(f"Target format: {target_format}")
         
         if file.filename == '':
             return jsonify({"error": "No file selected"}), 400
@@ -63,38 +204,59 @@ def convert_file():
         if not target_format:
             return jsonify({"error": "Target format not specified"}), 400
 
+        # Unique per request, so uploads arriving in the same second can't collide
+        file_id = f"{time.time_ns():x}_{os.urandom(4).hex()}"
+        
         # Save uploaded file
         filename = secure_filename(file.filename)
-        input_path = os.path.join(app.config['UPLOAD_FOLDER'], f"input_{int(time.time())}_{filename}")
-        file.save(input_path)
+        input_path = os.path.join(app.config['UPLOAD_FOLDER'], f"input_{file_id}_{filename}")
+        save_upload(file.stream, input_path)
+        input_size = os.path.getsize(input_path)
         
-        print(f"Input saved: {input_path}")
-        print(f"File size: {os.path.getsize(input_path)} bytes")
+        logger.debug(f"Input saved: {input_path}")
+        logger.debug(f"File size: {input_size} bytes")
         
         # Generate output path
         base_name = os.path.splitext(filename)[0]
         output_filename = f"converted_{base_name}.{target_format}"
-        output_path = os.path.join(app.config['UPLOAD_FOLDER'], f"output_{int(time.time())}_{output_filename}")
+        output_path = os.path.join(app.config['UPLOAD_FOLDER'], f"output_{file_id}_{output_filename}")
         
-        # Perform conversion
-        result_path = perform_conversion(input_path, output_path, target_format)
+        # Perform conversion in the process pool
+        try:
+            result_path = get_executor().submit(perform_conversion, input_path, output_path, target_format).result()
+        except BrokenProcessPool:
+            reset_executor()
+            raise
+        
+        # One stat both checks the output exists and gets its size
+        try:
+            file_size = os.stat(result_path).st_size if result_path else None
+        except FileNotFoundError:
+            file_size = None
         
-        if result_path and os.path.exists(result_path):
-            file_size = os.path.getsize(result_path)
-            print(f"Conversion SUCCESS! Output: {result_path} ({file_size} bytes)")
+        if file_size is not None:
+            logger.info(f"Conversion SUCCESS! Output: {result_path} ({file_size} bytes)")
             
-            return send_file(
+            response = send_file(
                 result_path,
                 as_attachment=True,
                 download_name=output_filename,
                 mimetype=get_mimetype(target_format)
             )
+            
+            if app.use_x_sendfile:
+                # Only the path is sent; remove the file once the front-end has had time to serve it
+                cleanup_timer = threading.Timer(X_SENDFILE_CLEANUP_DELAY, cleanup_file, args=(result_path,))
+                cleanup_timer.daemon = True
+                cleanup_timer.start()
+                output_path = None
+            
+            return response
         else:
             return jsonify({"error": "Conversion failed - no output file created"}), 500
             
     except Exception as e:
-        print(f"❌ Conversion ERROR: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception(f"❌ Conversion ERROR: {str(e)}")
         return jsonify({"error": f"Conversion failed: {str(e)}"}), 500
     finally:
         # Cleanup files
@@ -105,71 +267,105 @@ def perform_conversion(input_path, output_path, target_format):
     """Main conversion router"""
     input_ext = os.path.splitext(input_path)[1].lower()
     
-    print(f"Converting {input_ext} to {target_format}")
-    
-    # PDF to DOCX - Use professional converter
-    if input_ext == '.pdf' and target_format == 'docx':
-        return pdf_to_docx_professional(input_path, output_path)
-    
-    # PDF to TXT
-    elif input_ext == '.pdf' and target_format == 'txt':
-        return pdf_to_txt_advanced(input_path, output_path)
-    
-    # DOCX to PDF
-    elif input_ext == '.docx' and target_format == 'pdf':
-        return docx_to_pdf_professional(input_path, output_path)
+    logger.info(f"Converting {input_ext} to {target_format}")
     
-    # DOCX to TXT
-    elif input_ext == '.docx' and target_format == 'txt':
-        return docx_to_txt_advanced(input_path, output_path)
-    
-    else:
+    converter = CONVERSION_ROUTES.get((input_ext, target_format))
+    if converter is None:
         raise ValueError(f"Unsupported conversion: {input_ext} to {target_format}")
+    
+    return converter(input_path, output_path)
+
+# PDFs above this size are opened by path instead of being copied into memory (and into
+# every page worker); must stay well under MAX_CONTENT_LENGTH to ever apply
+LARGE_PDF_SIZE = 16 * 1024 * 1024  # 16MB
+
+def read_pdf_bytes(pdf_path):
+    """Read a PDF into memory, hinting the kernel that access is sequential"""
+    fd = os.open(pdf_path, os.O_RDONLY)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        with os.fdopen(fd, 'rb', closefd=False) as f:
+            return f.read()
+    finally:
+        os.close(fd)
+
+def prefetch_pdf(pdf_path):
+    """Map a PDF and ask the kernel to read it ahead sequentially into the page cache"""
+    with open(pdf_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_WILLNEED'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+                mm.madvise(mmap.MADV_WILLNEED)
+
+def load_pdf_source(pdf_path):
+    """Return the PDF bytes, or for very large scans the prefetched path"""
+    if os.path.getsize(pdf_path) > LARGE_PDF_SIZE:
+        # Demand-paged by MuPDF from the page cache rather than read() into every process
+        prefetch_pdf(pdf_path)
+        return pdf_path
+    return read_pdf_bytes(pdf_path)
+
+def open_pdf(pdf_source):
+    """Open a PDF source returned by load_pdf_source"""
+    if isinstance(pdf_source, str):
+        return fitz.open(pdf_source)
+    return fitz.open(stream=pdf_source, filetype='pdf')
 
 def pdf_to_docx_professional(pdf_path, docx_path):
     """Professional PDF to DOCX conversion with images and formatting"""
     try:
-        print("🔄 Starting professional PDF to DOCX conversion...")
+        logger.info("🔄 Starting professional PDF to DOCX conversion...")
+        
+        # Load the upload once; both converters share it
+        pdf_source = load_pdf_source(pdf_path)
         
         # Method 1: Try pdf2docx first (best for layout preservation)
         try:
             from pdf2docx import Converter
-            print("Trying pdf2docx converter...")
-            cv = Converter(pdf_path)
+            logger.debug("Trying pdf2docx converter...")
+            if isinstance(pdf_source, str):
+                cv = Converter(pdf_source)
+            else:
+                cv = Converter(stream=pdf_source)
             cv.convert(docx_path, start=0, end=None)
             cv.close()
             
             # Verify conversion worked
             if os.path.exists(docx_path) and os.path.getsize(docx_path) > 0:
-                print("✅ pdf2docx conversion successful!")
+                logger.info("✅ pdf2docx conversion successful!")
                 return docx_path
             else:
-                print("❌ pdf2docx produced empty file, trying fallback...")
+                logger.warning("❌ pdf2docx produced empty file, trying fallback...")
         except Exception as e:
-            print(f"❌ pdf2docx failed: {e}, trying advanced fallback...")
+            logger.warning(f"❌ pdf2docx failed: {e}, trying advanced fallback...")
         
         # Method 2: Advanced fallback with PyMuPDF
-        return pdf_to_docx_advanced_fallback(pdf_path, docx_path)
+        return pdf_to_docx_advanced_fallback(pdf_path, docx_path, pdf_source)
         
     except Exception as e:
         raise Exception(f"Professional PDF to DOCX conversion failed: {str(e)}")
 
-def pdf_to_docx_advanced_fallback(pdf_path, docx_path):
+def pdf_to_docx_advanced_fallback(pdf_path, docx_path, pdf_source=None):
     """Advanced fallback with better formatting and image extraction"""
     try:
-        print("Using advanced PyMuPDF fallback...")
+        logger.info("Using advanced PyMuPDF fallback...")
+        
+        if pdf_source is None:
+            pdf_source = load_pdf_source(pdf_path)
+        pdf_doc = open_pdf(pdf_source)
         
-        pdf_doc = fitz.open(pdf_path)
         word_doc = Document()
         
         # Set document properties
         word_doc.core_properties.title = "Converted PDF Document"
         
-        # Process each page
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc.load_page(page_num)
-            
-            print(f"Processing page {page_num + 1}...")
+        # Embedded picture (rId, width, height) by image hash, reused for images repeated across pages
+        picture_cache = {}
+        
+        # Pages are extracted in parallel; the Document is built here in page order
+        for page_num, page_data in enumerate(map_pages(pdf_source, pdf_doc, _process_page)):
+            logger.debug(f"Processing page {page_num + 1}...")
             
             # Add page header
             if page_num > 0:
@@ -178,129 +374,225 @@ def pdf_to_docx_advanced_fallback(pdf_path, docx_path):
             # Add page number indicator
             page_header = word_doc.add_paragraph()
             page_header_run = page_header.add_run(f"--- Page {page_num + 1} ---")
-            page_header_run.font.size = Pt(9)
-            page_header_run.font.color.rgb = RGBColor(128, 128, 128)
+            page_header_run.font.size = SMALL_FONT_SIZE
+            page_header_run.font.color.rgb = HEADER_COLOR
             page_header.alignment = WD_ALIGN_PARAGRAPH.CENTER
             
-            # Extract images from the page
-            image_list = page.get_images()
+            # Add text and images in reading order; text between images is appended as one OXML batch
             image_count = 0
+            pending_xml = []
             
-            for img_index, img in enumerate(image_list):
+            for kind, value in page_data:
+                if kind == "text":
+                    pending_xml.extend(value)
+                    continue
+                
+                image_key, img_data = value
+                picture = picture_cache.get(image_key)
+                if picture is None and img_data is None:
+                    continue
+                
+                _append_paragraphs_xml(word_doc, pending_xml)
+                pending_xml = []
+                
                 try:
-                    xref = img[0]
-                    pix = fitz.Pixmap(pdf_doc, xref)
+                    # Add image to document
+                    paragraph = word_doc.add_paragraph()
+                    paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                    run = paragraph.add_run()
                     
-                    if pix.n - pix.alpha < 4:  # RGB or CMYK
-                        img_data = pix.tobytes("png")
-                        
-                        # Save image temporarily
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp_img:
-                            temp_img.write(img_data)
-                            temp_img_path = temp_img.name
-                        
-                        # Add image to document
-                        paragraph = word_doc.add_paragraph()
-                        paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        run = paragraph.add_run()
-                        
-                        # Add image with reasonable size
-                        run.add_picture(temp_img_path, width=Inches(5.0))
-                        
-                        # Add image caption
-                        caption = word_doc.add_paragraph()
-                        caption_run = caption.add_run(f"[Image {image_count + 1}]")
-                        caption_run.font.size = Pt(9)
-                        caption_run.font.italic = True
-                        caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        
-                        image_count += 1
-                        
-                        # Cleanup temp file
-                        os.unlink(temp_img_path)
+                    if picture is None:
+                        # Add image with reasonable size, straight from memory
+                        shape = run.add_picture(io.BytesIO(img_data), width=IMAGE_WIDTH)
+                        r_id = shape._inline.xpath('.//a:blip/@r:embed')[0]
+                        picture_cache[image_key] = (r_id, shape.width, shape.height)
+                    else:
+                        # Repeat: point a new drawing at the image part already in the package
+                        r_id, cx, cy = picture
+                        run._r.add_drawing(CT_Inline.new_pic_inline(word_doc.part.next_id, r_id, f"image{image_count + 1}", cx, cy))
                     
-                    pix = None
+                    # Add image caption
+                    caption = word_doc.add_paragraph()
+                    caption_run = caption.add_run(f"[Image {image_count + 1}]")
+                    caption_run.font.size = SMALL_FONT_SIZE
+                    caption_run.font.italic = True
+                    caption.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                    
+                    image_count += 1
                     
                 except Exception as img_error:
-                    print(f"Image extraction error: {img_error}")
+                    logger.warning(f"Image extraction error: {img_error}")
                     continue
             
-            # Extract text with formatting information
-            text_blocks = page.get_text("dict")
+            # Text after the last image
+            _append_paragraphs_xml(word_doc, pending_xml)
             
-            for block in text_blocks.get("blocks", []):
-                if "lines" in block:
-                    for line in block["lines"]:
-                        paragraph = word_doc.add_paragraph()
-                        
-                        for span in line["spans"]:
-                            text = span["text"].strip()
-                            if not text:
-                                continue
-                            
-                            run = paragraph.add_run(text + " ")
-                            
-                            # Apply font formatting
-                            font_size = span["size"]
-                            if font_size > 12:
-                                run.font.size = Pt(min(font_size, 36))  # Cap at 36pt
-                            
-                            # Bold detection
-                            if span["flags"] & 2:  # Bold flag
-                                run.font.bold = True
-                            
-                            # Italic detection
-                            if span["flags"] & 1:  # Italic flag
-                                run.font.italic = True
-                            
-                            # Font color (basic conversion)
-                            if span["color"] != 0:
-                                try:
-                                    # Convert color (simplified)
-                                    color = span["color"]
-                                    if color != 0:
-                                        run.font.color.rgb = RGBColor(0, 0, 0)  # Default to black
-                                except:
-                                    pass
-                        
-                        # Set paragraph formatting
-                        if paragraph.text.strip():
-                            paragraph.paragraph_format.space_after = Pt(8)
-                            paragraph.paragraph_format.line_spacing = 1.15
-            
-            print(f"Page {page_num + 1} completed - {image_count} images extracted")
+            logger.debug(f"Page {page_num + 1} completed - {image_count} images extracted")
+        
+        pdf_doc.close()
         
         # Save the document
         word_doc.save(docx_path)
-        pdf_doc.close()
         
-        print("✅ Advanced PDF to DOCX conversion completed successfully")
+        logger.info("✅ Advanced PDF to DOCX conversion completed successfully")
         return docx_path
         
     except Exception as e:
         raise Exception(f"Advanced PDF to DOCX fallback failed: {str(e)}")
 
+# Per-page PDF work runs in its own pool; each worker opens the PDF once.
+# Only long PDFs get a pool (MIN_PARALLEL_PAGES), so short ones don't oversubscribe the host
+PAGE_WORKERS = int(os.environ.get('PAGE_WORKERS', min(os.cpu_count() or 1, 8)))
+MIN_PARALLEL_PAGES = 16  # smaller PDFs finish before a page pool would start
+MIN_IMAGE_DIMENSION = 32  # px - smaller images are rules, bullets and specks
+SCANNED_PAGE_TEXT_CHARS = 32  # pages with images and less text than this are scans
+# Text and image blocks come out of a single TextPage pass
+TEXTPAGE_FLAGS = (fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_PRESERVE_WHITESPACE
+                  | fitz.TEXT_PRESERVE_IMAGES | fitz.TEXT_MEDIABOX_CLIP)
+_page_doc = None
+_seen_images = set()
+
+def _init_page_worker(pdf_source, doc=None):
+    """Open the PDF once per page worker (or reuse an open handle)"""
+    global _page_doc
+    start_log_listener()
+    _page_doc = doc if doc is not None else open_pdf(pdf_source)
+    _seen_images.clear()
+
+def _close_page_doc(owned=True):
+    global _page_doc
+    if _page_doc is not None:
+        if owned:
+            _page_doc.close()
+        _page_doc = None
+
+def _block_paragraphs_xml(block):
+    """Build one OXML paragraph per text line of a block, with formatting from its spans"""
+    block_xml = []
+    for line in block.get("lines", []):
+        runs_xml = []
+        
+        for span in line["spans"]:
+            text = span["text"].strip()
+            if not text:
+                continue
+            
+            # Apply font formatting
+            font_size = span["size"]
+            if font_size <= MIN_SCALED_FONT_SIZE:
+                font_size = None
+            elif font_size > MAX_FONT_SIZE:
+                font_size = MAX_FONT_SIZE
+            
+            flags = span["flags"]
+            rpr = _run_properties_xml(
+                bold=bool(flags & 2),  # Bold flag
+                italic=bool(flags & 1),  # Italic flag
+                size=font_size,
+                black=span["color"] != 0  # Font color (simplified) - default to black
+            )
+            runs_xml.append(f'<w:r>{rpr}<w:t xml:space="preserve">{xml_escape(text)} </w:t></w:r>')
+        
+        # Set paragraph formatting
+        if runs_xml:
+            block_xml.append(f'<w:p>{PARAGRAPH_PPR_XML}{"".join(runs_xml)}</w:p>')
+        else:
+            block_xml.append('<w:p/>')
+    
+    return block_xml
+
+def _picture_bytes(block):
+    """Image block bytes Word can embed, re-encoding only when needed"""
+    # PNG and JPEG in gray or RGB go into the DOCX as-is
+    if block["ext"] in ("png", "jpeg", "jpg") and block["colorspace"] in (1, 3):
+        return block["image"]
+    
+    pix = fitz.Pixmap(block["image"])
+    if pix.n - pix.alpha >= 4:  # CMYK
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+    if pix.n == 3 and not pix.alpha:
+        # Opaque RGB is usually photographic - JPEG is smaller and faster to encode
+        return pix.tobytes("jpeg", jpg_quality=85)
+    return pix.tobytes("png")
+
+def _process_page(page_num):
+    """Extract a page's text paragraphs and images in reading order (runs in a page worker)"""
+    page = _page_doc.load_page(page_num)
+    
+    # One TextPage pass yields text and image blocks together, sorted top to bottom
+    textpage = page.get_textpage(flags=TEXTPAGE_FLAGS)
+    blocks = textpage.extractDICT(sort=True).get("blocks", [])
+    
+    # Scanned image-only pages have no text worth formatting
+    has_images = any(block["type"] == 1 for block in blocks)
+    skip_text = has_images and len(textpage.extractText().strip()) < SCANNED_PAGE_TEXT_CHARS
+    
+    content = []
+    for block in blocks:
+        if block["type"] == 0:
+            if not skip_text:
+                content.append(("text", _block_paragraphs_xml(block)))
+            continue
+        
+        # Skip tiny images - rules, bullets and specks
+        if block["width"] < MIN_IMAGE_DIMENSION or block["height"] < MIN_IMAGE_DIMENSION:
+            continue
+        
+        # Repeated images (logos, headers) are sent once; this worker handles
+        # pages in order, so the parent already has the bytes
+        image_key = hashlib.sha1(block["image"]).hexdigest()
+        if image_key in _seen_images:
+            content.append(("image", (image_key, None)))
+            continue
+        
+        try:
+            content.append(("image", (image_key, _picture_bytes(block))))
+            _seen_images.add(image_key)
+        except Exception as img_error:
+            logger.warning(f"Image extraction error: {img_error}")
+            continue
+    
+    return content
+
+def _page_text(page_num):
+    """Extract layout-sorted text from one page (runs in a page worker)"""
+    return _page_doc.load_page(page_num).get_text("text", sort=True)
+
+def map_pages(pdf_source, pdf_doc, func):
+    """Run func over every page in a process pool, yielding results in page order"""
+    page_count = len(pdf_doc)
+    workers = min(PAGE_WORKERS, page_count)
+    
+    # Short document or no spare cores: not worth starting processes, reuse the caller's handle
+    if workers <= 1 or page_count < MIN_PARALLEL_PAGES:
+        _init_page_worker(pdf_source, pdf_doc)
+        try:
+            for page_num in range(page_count):
+                yield func(page_num)
+        finally:
+            _close_page_doc(owned=False)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker, initargs=(pdf_source,)) as executor:
+        yield from executor.map(func, range(page_count), chunksize=4)
+
 def pdf_to_txt_advanced(pdf_path, txt_path):
     """Advanced PDF to text conversion with layout preservation"""
     try:
-        print("Converting PDF to TXT (advanced)...")
+        logger.info("Converting PDF to TXT (advanced)...")
         
-        pdf_doc = fitz.open(pdf_path)
-        full_text = []
+        pdf_source = load_pdf_source(pdf_path)
         
-        for page_num in range(len(pdf_doc)):
-            page = pdf_doc.load_page(page_num)
-            
-            # Get text with layout preservation
-            text = page.get_text("text", sort=True)
-            
-            if text.strip():
-                full_text.append(f"\n{'='*50}")
-                full_text.append(f"PAGE {page_num + 1}")
-                full_text.append(f"{'='*50}\n")
-                full_text.append(text.strip())
+        full_text = []
         
-        pdf_doc.close()
+        # Get text with layout preservation, pages extracted in parallel
+        with open_pdf(pdf_source) as pdf_doc:
+            for page_num, text in enumerate(map_pages(pdf_source, pdf_doc, _page_text)):
+                if text.strip():
+                    full_text.append(f"\n{'='*50}")
+                    full_text.append(f"PAGE {page_num + 1}")
+                    full_text.append(f"{'='*50}\n")
+                    full_text.append(text.strip())
         
         # Clean and format text
         cleaned_text = clean_extracted_text('\n'.join(full_text))
@@ -309,48 +601,116 @@ def pdf_to_txt_advanced(pdf_path, txt_path):
         with open(txt_path, 'w', encoding='utf-8') as f:
             f.write(cleaned_text)
         
-        print("PDF to TXT conversion completed successfully")
+        logger.info("PDF to TXT conversion completed successfully")
         return txt_path
         
     except Exception as e:
         raise Exception(f"PDF to TXT conversion failed: {str(e)}")
 
+# WordprocessingML names for streaming DOCX text extraction
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W_BODY = f'{{{W_NS}}}body'
+W_P = f'{{{W_NS}}}p'
+W_TBL = f'{{{W_NS}}}tbl'
+W_TR = f'{{{W_NS}}}tr'
+W_TC = f'{{{W_NS}}}tc'
+W_T = f'{{{W_NS}}}t'
+W_TAB = f'{{{W_NS}}}tab'
+W_TYPE = f'{{{W_NS}}}type'
+W_VAL = f'{{{W_NS}}}val'
+W_STYLE_ID = f'{{{W_NS}}}styleId'
+# Same run content python-docx's Paragraph.text sees: direct and hyperlink runs
+_RUN_CONTENT = etree.XPath(
+    './w:r/*[self::w:t or self::w:tab or self::w:br or self::w:cr]'
+    ' | ./w:hyperlink/w:r/*[self::w:t or self::w:tab or self::w:br or self::w:cr]',
+    namespaces={'w': W_NS}
+)
+_PARAGRAPH_STYLE = etree.XPath('string(./w:pPr/w:pStyle/@w:val)', namespaces={'w': W_NS})
+_STYLE_NAMES = etree.XPath('/w:styles/w:style[w:name]', namespaces={'w': W_NS})
+_STYLE_NAME = etree.XPath('string(./w:name/@w:val)', namespaces={'w': W_NS})
+
+def _paragraph_text(p):
+    """Text of a w:p element, matching python-docx's Paragraph.text"""
+    parts = []
+    for el in _RUN_CONTENT(p):
+        if el.tag == W_T:
+            parts.append(el.text or '')
+        elif el.tag == W_TAB:
+            parts.append('\t')
+        elif el.get(W_TYPE, 'textWrapping') == 'textWrapping':
+            parts.append('\n')  # w:br / w:cr line breaks
+    return ''.join(parts)
+
+def _heading_levels(docx_zip):
+    """Map heading style IDs to their level, e.g. {'Heading2': 2}"""
+    try:
+        styles = etree.fromstring(docx_zip.read('word/styles.xml'))
+    except KeyError:
+        return {}
+    
+    levels = {}
+    for style in _STYLE_NAMES(styles):
+        name = _STYLE_NAME(style)
+        if name.lower().startswith('heading'):
+            level = name.split()[-1]
+            levels[style.get(W_STYLE_ID)] = int(level) if level.isdigit() else 1
+    return levels
+
 def docx_to_txt_advanced(docx_path, txt_path):
     """Advanced DOCX to text conversion with formatting awareness"""
     try:
-        print("Converting DOCX to TXT (advanced)...")
+        logger.info("Converting DOCX to TXT (advanced)...")
         
-        doc = Document(docx_path)
         full_text = []
+        table_text = []
         
-        for paragraph in doc.paragraphs:
-            text = paragraph.text.strip()
-            if text:
-                # Detect headings by style
-                if paragraph.style.name.startswith('Heading'):
-                    level = paragraph.style.name.split()[-1] if 'Heading' in paragraph.style.name else '1'
-                    full_text.append(f"\n{'#' * int(level)} {text}")
-                else:
-                    full_text.append(text)
-        
-        # Extract tables
-        for table in doc.tables:
-            full_text.append("\n" + "-" * 40)
-            full_text.append("TABLE:")
-            full_text.append("-" * 40)
+        # Stream word/document.xml instead of building python-docx's object model
+        with zipfile.ZipFile(docx_path) as docx_zip:
+            heading_levels = _heading_levels(docx_zip)
             
-            for row in table.rows:
-                row_text = " | ".join(cell.text.strip() for cell in row.cells if cell.text.strip())
-                if row_text:
-                    full_text.append(row_text)
-            
-            full_text.append("-" * 40)
+            with docx_zip.open('word/document.xml') as f:
+                for _, el in etree.iterparse(f, events=('end',), tag=(W_P, W_TBL)):
+                    # Paragraphs inside tables are read with their table
+                    parent = el.getparent()
+                    if parent is None or parent.tag != W_BODY:
+                        continue
+                    
+                    if el.tag == W_P:
+                        text = _paragraph_text(el).strip()
+                        if text:
+                            # Detect headings by style
+                            level = heading_levels.get(_PARAGRAPH_STYLE(el))
+                            if level:
+                                full_text.append(f"\n{'#' * level} {text}")
+                            else:
+                                full_text.append(text)
+                    else:
+                        # Extract tables (written after the body text, as before)
+                        table_text.append("\n" + "-" * 40)
+                        table_text.append("TABLE:")
+                        table_text.append("-" * 40)
+                        
+                        for row in el.iterchildren(W_TR):
+                            cells = ("\n".join(_paragraph_text(p) for p in cell.iterchildren(W_P)).strip()
+                                     for cell in row.iterchildren(W_TC))
+                            row_text = " | ".join(cell for cell in cells if cell)
+                            if row_text:
+                                table_text.append(row_text)
+                        
+                        table_text.append("-" * 40)
+                    
+                    # Drop finished body elements to keep memory flat
+                    el.clear()
+                    while el.getprevious() is not None:
+                        del parent[0]
+        
+        full_text.extend(table_text)
         
         # Write to file
         with open(txt_path, 'w', encoding='utf-8') as f:
             f.write('\n'.join(full_text))
         
-        print("DOCX to TXT conversion completed successfully")
+        logger.info("DOCX to TXT conversion completed successfully")
         return txt_path
         
     except Exception as e:
@@ -359,20 +719,20 @@ def docx_to_txt_advanced(docx_path, txt_path):
 def docx_to_pdf_professional(docx_path, pdf_path):
     """Professional DOCX to PDF conversion"""
     try:
-        print("Converting DOCX to PDF...")
+        logger.info("Converting DOCX to PDF...")
         
         # Method 1: Try Windows Word first (best quality)
         if os.name == 'nt':
             try:
                 return docx_to_pdf_windows(docx_path, pdf_path)
             except Exception as e:
-                print(f"Windows Word conversion failed: {e}")
+                logger.warning(f"Windows Word conversion failed: {e}")
         
         # Method 2: Try LibreOffice
         try:
             return docx_to_pdf_libreoffice(docx_path, pdf_path)
         except Exception as e:
-            print(f"LibreOffice conversion failed: {e}")
+            logger.warning(f"LibreOffice conversion failed: {e}")
         
         # Method 3: Use reportlab as fallback
         return docx_to_pdf_reportlab(docx_path, pdf_path)
@@ -380,35 +740,168 @@ def docx_to_pdf_professional(docx_path, pdf_path):
     except Exception as e:
         raise Exception(f"DOCX to PDF conversion failed: {str(e)}")
 
+# One warm Word instance per conversion worker process, started on first use
+_word_app = None
+_word_lock = threading.Lock()
+_com_initialized = False
+
+def _word_alive(word):
+    """Check whether a Word instance still responds"""
+    try:
+        word.Visible  # Raises if Word has exited or crashed
+        return True
+    except Exception:
+        return False
+
+def _get_word_app():
+    """Get this process's Word instance, starting Word (and COM) if needed"""
+    global _word_app, _com_initialized
+    if _word_app is not None and not _word_alive(_word_app):
+        _quit_word_app()
+    
+    if _word_app is None:
+        # Imported here: pywin32 only exists on Windows and only Word conversions need it
+        import pythoncom
+        import win32com.client
+        
+        if not _com_initialized:
+            # Kept initialized for the process lifetime so the cached app stays valid
+            pythoncom.CoInitialize()
+            _com_initialized = True
+            # Pool workers skip atexit handlers; multiprocessing finalizers still run
+            multiprocessing.util.Finalize(None, _quit_word_app, exitpriority=10)
+        
+        # Private out-of-process instance: not shared with other workers or an interactive Word
+        word = win32com.client.DispatchEx("Word.Application")
+        word.Visible = False
+        word.DisplayAlerts = 0  # wdAlertsNone - never block on a dialog
+        word.ScreenUpdating = False
+        word.Options.Pagination = False  # Skip background repagination
+        _word_app = word
+    return _word_app
+
+def _quit_word_app():
+    """Quit the cached Word instance, if any"""
+    global _word_app
+    if _word_app is not None:
+        try:
+            _word_app.Quit()
+        except Exception:
+            pass
+        _word_app = None
+
 def docx_to_pdf_windows(docx_path, pdf_path):
     """Use Microsoft Word on Windows (best quality)"""
     try:
-        pythoncom.CoInitialize()
-        word = win32com.client.Dispatch("Word.Application")
-        word.Visible = False
-        
         # Use absolute paths
         abs_docx_path = os.path.abspath(docx_path)
         abs_pdf_path = os.path.abspath(pdf_path)
         
-        doc = word.Documents.Open(abs_docx_path)
-        doc.SaveAs(abs_pdf_path, FileFormat=17)  # 17 = PDF format
-        doc.Close()
-        word.Quit()
+        # Word COM is single-threaded; one document at a time per instance
+        with _word_lock:
+            word = _get_word_app()
+            doc = word.Documents.Open(abs_docx_path, ReadOnly=True, AddToRecentFiles=False)
+            try:
+                doc.SaveAs(abs_pdf_path, FileFormat=17)  # 17 = PDF format
+            finally:
+                doc.Close(SaveChanges=0)
         
-        print("DOCX to PDF conversion completed (Windows Word - Professional)")
+        logger.info("DOCX to PDF conversion completed (Windows Word - Professional)")
         return pdf_path
     except Exception as e:
         raise Exception(f"Windows Word conversion error: {str(e)}")
-    finally:
+
+# Persistent LibreOffice listener (unoserver) shared by all conversion workers.
+# Only the main process starts, restarts and stops it; pool workers just health-check it
+UNO_HOST = os.environ.get('UNO_HOST', '127.0.0.1')
+UNO_PORT = int(os.environ.get('UNO_PORT', 2003))
+UNO_SOFFICE_PORT = int(os.environ.get('UNO_SOFFICE_PORT', 2002))
+UNO_RESTART_INTERVAL = 5  # seconds between liveness checks
+_uno_server = None
+_uno_lock = threading.Lock()
+
+def uno_server_alive():
+    """Check whether the persistent unoserver is accepting connections"""
+    try:
+        with socket.create_connection((UNO_HOST, UNO_PORT), timeout=1):
+            return True
+    except OSError:
+        return False
+
+def ensure_uno_server(wait_seconds=10):
+    """Start the persistent unoserver if it isn't running yet (main process only)"""
+    global _uno_server
+    if multiprocessing.parent_process() is not None:
+        return uno_server_alive()
+    if uno_server_alive():
+        return True
+    
+    with _uno_lock:
+        if uno_server_alive():
+            return True
+        
+        if _uno_server is not None and _uno_server.poll() is None:
+            _uno_server.kill()
+        
         try:
-            pythoncom.CoUninitialize()
-        except:
-            pass
+            _uno_server = subprocess.Popen(
+                ['unoserver', '--interface', UNO_HOST, '--port', str(UNO_PORT),
+                 '--uno-port', str(UNO_SOFFICE_PORT)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        except FileNotFoundError:
+            _uno_server = None
+            return False
+        
+        deadline = time.time() + wait_seconds
+        while time.time() < deadline:
+            if uno_server_alive():
+                return True
+            if _uno_server.poll() is not None:
+                break
+            time.sleep(0.2)
+        return False
+
+def _stop_uno_server():
+    """Stop the unoserver this process started, if any"""
+    if _uno_server is not None and _uno_server.poll() is None:
+        _uno_server.terminate()
+
+atexit.register(_stop_uno_server)
+
+def _watch_uno_server():
+    """Restart unoserver from the main process whenever it goes down"""
+    while True:
+        time.sleep(UNO_RESTART_INTERVAL)
+        if not ensure_uno_server():
+            logger.warning("unoserver unavailable; LibreOffice will start per request")
+
+def start_uno_server():
+    """Start unoserver and keep it running for the life of the main process"""
+    ready = ensure_uno_server()
+    if _uno_server is not None:
+        threading.Thread(target=_watch_uno_server, daemon=True).start()
+    return ready
 
 def docx_to_pdf_libreoffice(docx_path, pdf_path):
     """Use LibreOffice for conversion"""
     try:
+        # Prefer the warm soffice instance - avoids seconds of start-up per request.
+        # unoserver handles one conversion at a time, so concurrent workers queue there.
+        # Runs in a pool worker: only health-check it, the main process restarts it
+        if uno_server_alive():
+            try:
+                result = subprocess.run(
+                    ['unoconvert', '--host', UNO_HOST, '--port', str(UNO_PORT), docx_path, pdf_path],
+                    capture_output=True, text=True, timeout=120
+                )
+                if result.returncode == 0 and os.path.exists(pdf_path):
+                    logger.info("DOCX to PDF conversion completed (LibreOffice unoserver)")
+                    return pdf_path
+                logger.warning(f"unoserver conversion failed: {result.stderr.strip()}")
+            except (subprocess.TimeoutExpired, FileNotFoundError):
+                pass
+        
         output_dir = os.path.dirname(pdf_path)
         
         # Try different LibreOffice command variations
@@ -428,7 +921,7 @@ def docx_to_pdf_libreoffice(docx_path, pdf_path):
                     
                     if os.path.exists(expected_pdf):
                         os.rename(expected_pdf, pdf_path)
-                        print("DOCX to PDF conversion completed (LibreOffice)")
+                        logger.info("DOCX to PDF conversion completed (LibreOffice)")
                         return pdf_path
             except (subprocess.TimeoutExpired, FileNotFoundError):
                 continue
@@ -445,7 +938,7 @@ def docx_to_pdf_reportlab(docx_path, pdf_path):
         from reportlab.pdfgen import canvas
         from reportlab.lib.utils import ImageReader
         
-        print("Using ReportLab fallback for DOCX to PDF...")
+        logger.info("Using ReportLab fallback for DOCX to PDF...")
         
         doc = Document(docx_path)
         c = canvas.Canvas(pdf_path, pagesize=letter)
@@ -454,77 +947,74 @@ def docx_to_pdf_reportlab(docx_path, pdf_path):
         y_position = height - 50
         line_height = 14
         
+        # Font state is set per page (showPage() resets it); text objects inherit it
+        c.setFont("Helvetica", 12, leading=line_height)
+        
         for paragraph in doc.paragraphs:
             text = paragraph.text.strip()
             if text:
                 # Simple text wrapping
-                words = text.split()
-                lines = []
-                current_line = []
-                
-                for word in words:
-                    current_line.append(word)
-                    test_line = ' '.join(current_line)
-                    if len(test_line) > 80:
-                        lines.append(' '.join(current_line[:-1]))
-                        current_line = [word]
+                lines = textwrap.wrap(text, width=80, break_long_words=False, break_on_hyphens=False)
                 
-                if current_line:
-                    lines.append(' '.join(current_line))
-                
-                # Add lines to PDF
-                for line in lines:
+                # Add lines to PDF, one text object per page the paragraph touches
+                while lines:
                     if y_position < 50:
                         c.showPage()
+                        c.setFont("Helvetica", 12, leading=line_height)
                         y_position = height - 50
                     
-                    c.drawString(50, y_position, line)
-                    y_position -= line_height
+                    fit = int((y_position - 50) // line_height) + 1
+                    text_object = c.beginText(50, y_position)
+                    text_object.textLines(lines[:fit])
+                    c.drawText(text_object)
+                    y_position = text_object.getY()
+                    lines = lines[fit:]
                 
                 # Space between paragraphs
                 y_position -= line_height / 2
         
         c.save()
-        print("DOCX to PDF conversion completed (ReportLab Fallback)")
+        logger.info("DOCX to PDF conversion completed (ReportLab Fallback)")
         return pdf_path
         
     except Exception as e:
         raise Exception(f"ReportLab conversion error: {str(e)}")
 
+# Per-line edge whitespace (not newlines) and runs of blank lines
+_LINE_EDGE_WS = re.compile(r'^[^\S\n]+|[^\S\n]+$', re.M)
+_BLANK_RUNS = re.compile(r'\n{3,}')
+
 def clean_extracted_text(text):
     """Clean and format extracted text"""
     if not text:
         return "No text content found."
     
-    # Remove excessive whitespace but preserve paragraph breaks
-    lines = text.split('\n')
-    cleaned_lines = []
+    # Strip each line and collapse blank runs to a single empty line
+    text = _LINE_EDGE_WS.sub('', text)
+    text = _BLANK_RUNS.sub('\n\n', text).lstrip('\n')
+    if text.endswith('\n\n'):
+        text = text[:-1]
     
-    for line in lines:
-        line = line.strip()
-        if line:
-            cleaned_lines.append(line)
-        elif cleaned_lines and cleaned_lines[-1] != '':
-            cleaned_lines.append('')
-    
-    # Remove multiple consecutive empty lines
-    result = []
-    for i, line in enumerate(cleaned_lines):
-        if line == '' and result and result[-1] == '':
-            continue
-        result.append(line)
-    
-    return '\n'.join(result)
+    return text
+
+# Conversion routes: (input extension, target format) -> converter
+CONVERSION_ROUTES = {
+    ('.pdf', 'docx'): pdf_to_docx_professional,  # Professional converter
+    ('.pdf', 'txt'): pdf_to_txt_advanced,
+    ('.docx', 'pdf'): docx_to_pdf_professional,
+    ('.docx', 'txt'): docx_to_txt_advanced,
+}
+
+MIMETYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'txt': 'text/plain',
+    'doc': 'application/msword',
+}
 
 def get_mimetype(format_name):
     """Get MIME type for file format"""
-    mimetypes = {
-        'pdf': 'application/pdf',
-        'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-        'txt': 'text/plain',
-        'doc': 'application/msword',
-    }
-    return mimetypes.get(format_name, 'application/octet-stream')
+    return MIMETYPES.get(format_name, 'application/octet-stream')
 
 def cleanup_file(file_path):
     """Cleanup a single file with retry"""
@@ -535,15 +1025,17 @@ def cleanup_file(file_path):
     for attempt in range(max_retries):
         try:
             os.remove(file_path)
-            print(f"Cleaned up: {file_path}")
+            logger.debug(f"Cleaned up: {file_path}")
             break
         except Exception as e:
             if attempt == max_retries - 1:
-                print(f"Warning: Could not delete {file_path}: {e}")
+                logger.warning(f"Could not delete {file_path}: {e}")
             time.sleep(0.1)
 
 if __name__ == '__main__':
-    print("🚀 Starting Professional Document Converter Service...")
-    print(f"📁 Upload folder: {UPLOAD_FOLDER}")
-    print("✅ Service ready! Waiting for conversion requests...")
+    logger.info("🚀 Starting Professional Document Converter Service...")
+    logger.info(f"📁 Upload folder: {UPLOAD_FOLDER}")
+    if os.name != 'nt' and start_uno_server():
+        logger.info(f"📄 LibreOffice listener ready on {UNO_HOST}:{UNO_PORT}")
+    logger.info("✅ Service ready! Waiting for conversion requests...")
     app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file